@@ -1,8 +1,21 @@
 import os
+import asyncio
+import hashlib
 import logging
 import random
+import time
+import weakref
+from collections import deque
+from statistics import fmean
 from typing import Optional
-from telegram import Update
+import orjson
+from aiolimiter import AsyncLimiter
+from cachetools import TTLCache
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from telegram import LinkPreviewOptions, Update
+from telegram.constants import ChatType
+from telegram.error import RetryAfter, TelegramError
 from telegram.ext import (
     Application,
     CommandHandler,
@@ -10,7 +23,20 @@ from telegram.ext import (
     ContextTypes,
     filters,
 )
+from telegram.request import HTTPXRequest
 import google.generativeai as genai
+from google.api_core.exceptions import (
+    DeadlineExceeded,
+    ResourceExhausted,
+    ServerError,
+    ServiceUnavailable,
+    TooManyRequests,
+)
+
+try:
+    import uvloop
+except ImportError:  # not available on Windows
+    uvloop = None
 
 # Configure logging
 logging.basicConfig(
@@ -22,47 +48,408 @@ logger = logging.getLogger(__name__)
 # Configuration
 TELEGRAM_TOKEN = os.environ.get('TELEGRAM_BOT_TOKEN')
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+
+# Webhook configuration (falls back to long polling when no public URL is set)
+WEBHOOK_URL = os.environ.get('WEBHOOK_URL') or os.environ.get('RENDER_EXTERNAL_URL')
+WEBHOOK_SECRET = os.environ.get('WEBHOOK_SECRET')
+PORT = int(os.environ.get('PORT', '8443'))
+
+# Only message updates are handled; Telegram skips delivering everything else
+ALLOWED_UPDATES = [Update.MESSAGE]
 
 # Configure Gemini
 genai.configure(api_key=GEMINI_API_KEY)
 model = genai.GenerativeModel('gemini-pro')
 
-# Game state storage (in-memory, resets on restart)
-game_state = {}
+# Static command responses
+START_TEXT = (
+    "🤖 Hello! I'm a Gemini-powered bot!\n\n"
+    "Commands:\n"
+    "/help - Show all commands\n"
+    "/ask [question] - Ask me anything\n"
+    "/dice - Roll a dice\n"
+    "/8ball [question] - Magic 8-ball\n"
+    "/trivia - Random trivia question\n"
+    "/rps [rock/paper/scissors] - Play Rock Paper Scissors\n"
+    "/flip - Flip a coin\n\n"
+    "In groups, mention me or reply to my messages to chat!"
+)
+
+HELP_TEXT = (
+    "📚 Available Commands:\n\n"
+    "🤖 AI Commands:\n"
+    "/ask [question] - Ask Gemini anything\n\n"
+    "🎮 Mini-Games:\n"
+    "/dice - Roll a 6-sided dice\n"
+    "/flip - Flip a coin\n"
+    "/8ball [question] - Ask the magic 8-ball\n"
+    "/trivia - Get a random trivia question\n"
+    "/rps [choice] - Rock, Paper, Scissors\n"
+    "  Example: /rps rock\n\n"
+    "💬 Group Chat:\n"
+    "Mention @botname or reply to my messages to chat with Gemini!"
+)
+
+NO_LINK_PREVIEW = LinkPreviewOptions(is_disabled=True)
+
+
+class OrjsonRequest(HTTPXRequest):
+    """HTTPX request that decodes Telegram API responses with orjson."""
+
+    @staticmethod
+    def parse_json_payload(payload: bytes) -> dict:
+        try:
+            return orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            # Invalid UTF-8 or JSON: let the stdlib path decode with errors="replace",
+            # or log the payload and raise TelegramError("Invalid server response")
+            return HTTPXRequest.parse_json_payload(payload)
+
+
+# Gemini throttling
+GEMINI_RPM = int(os.environ.get('GEMINI_RPM', '60'))
+GEMINI_TARGET_LATENCY = float(os.environ.get('GEMINI_TARGET_LATENCY', '5.0'))
+# Errors that signal Gemini is overloaded (429/5xx); only these shrink the concurrency limit
+GEMINI_OVERLOAD_ERRORS = (TooManyRequests, ServerError)
+
+# Gemini retries (transient errors only)
+GEMINI_RETRYABLE_ERRORS = (ResourceExhausted, ServiceUnavailable, DeadlineExceeded)
+GEMINI_RETRY_BASE_DELAY = 0.5
+GEMINI_RETRY_MAX_DELAY = 8.0
+
+# Minimum seconds between progressive edits of a streamed reply. Telegram allows ~1 edit/sec
+# per private chat but only ~20 messages/min per group.
+STREAM_EDIT_INTERVAL = 1.0
+STREAM_EDIT_INTERVAL_GROUP = 3.0
+
+# Maximum length of a single Telegram message
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+# Shown when Gemini returns an empty answer
+EMPTY_ANSWER_TEXT = "🤷 I don't have an answer for that."
+
+
+class AdaptiveLimiter:
+    """Concurrency limiter that adapts its limit using AIMD.
+
+    The wrapped function returns a (result, latency) pair; latency is the
+    sample fed to the controller, so a call can report e.g. time-to-first-chunk
+    while keeping its slot for longer.
+
+    The limit grows by one while the mean latency of recent successful calls
+    stays under the target. It is halved when a call raises one of
+    backoff_errors or the mean gets too slow, at most once per target_latency
+    window. Other failures leave the limit unchanged.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, target_latency: float, backoff_errors=()):
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.backoff_errors = backoff_errors
+        self._in_flight = 0
+        self._latencies = deque(maxlen=32)
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+
+    async def call(self, func, *args, **kwargs):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+        latency = None
+        overloaded = False
+        try:
+            result, latency = await func(*args, **kwargs)
+            return result
+        except self.backoff_errors:
+            overloaded = True
+            raise
+        finally:
+            # Bookkeeping is synchronous so a cancellation cannot leak the slot
+            now = time.monotonic()
+            self._in_flight -= 1
+            if overloaded:
+                self._decrease(now)
+            elif latency is not None:
+                self._latencies.append(latency)
+                if fmean(self._latencies) <= self.target_latency:
+                    self.limit = min(self.maximum, self.limit + 1)
+                else:
+                    self._decrease(now)
+            async with self._cond:
+                self._cond.notify_all()
+
+    def _decrease(self, now: float):
+        if now - self._last_decrease < self.target_latency:
+            return
+        self.limit = max(self.minimum, self.limit // 2)
+        self._last_decrease = now
+        # Samples taken at the old limit would keep triggering decreases
+        self._latencies.clear()
+
+
+gemini_limiter = AdaptiveLimiter(
+    initial=8,
+    minimum=1,
+    maximum=32,
+    target_latency=GEMINI_TARGET_LATENCY,
+    backoff_errors=GEMINI_OVERLOAD_ERRORS,
+)
+gemini_rate_limiter = AsyncLimiter(GEMINI_RPM, 60)
+
+# Cache of /ask answers keyed by normalized question
+answer_cache = TTLCache(maxsize=2048, ttl=600)
+# key -> [lock, number of callers holding or waiting on it]
+answer_locks = {}
+
+# One Gemini conversation turn at a time per group chat; idle locks are dropped automatically
+chat_locks = weakref.WeakValueDictionary()
+
+# Game state storage (shared across workers, entries expire automatically)
+redis_client = Redis.from_url(REDIS_URL, decode_responses=True)
+TRIVIA_TTL = 600
+TRIVIA_DECK_TTL = 86400
+
+# Pop the next index from a deck, refilling it from ARGV[2:] when empty, in one atomic step
+deal_trivia_script = redis_client.register_script("""
+local idx = redis.call('LPOP', KEYS[1])
+if not idx then
+    redis.call('RPUSH', KEYS[1], unpack(ARGV, 2))
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+    idx = redis.call('LPOP', KEYS[1])
+end
+return idx
+""")
+
+# Mini-game data
+RNG = random.Random()
+
+DICE_FACES = ("⚀", "⚁", "⚂", "⚃", "⚄", "⚅")
+
+COIN_SIDES = ("Heads", "Tails")
+
+EIGHT_BALL_RESPONSES = (
+    "Yes, definitely!", "It is certain.", "Without a doubt.",
+    "You may rely on it.", "As I see it, yes.", "Most likely.",
+    "Outlook good.", "Signs point to yes.", "Reply hazy, try again.",
+    "Ask again later.", "Better not tell you now.", "Cannot predict now.",
+    "Concentrate and ask again.", "Don't count on it.", "My reply is no.",
+    "My sources say no.", "Outlook not so good.", "Very doubtful."
+)
+
+RPS_CHOICES = ("rock", "paper", "scissors")
+RPS_EMOJI = {"rock": "✊", "paper": "✋", "scissors": "✌️"}
+# (user choice, bot choice) -> outcome; every pair not listed is a loss for the user
+RPS_OUTCOME = {
+    ("rock", "scissors"): "win", ("paper", "rock"): "win", ("scissors", "paper"): "win",
+    ("rock", "rock"): "tie", ("paper", "paper"): "tie", ("scissors", "scissors"): "tie",
+}
+RPS_RESULT_TEXT = {"win": "You win! 🎉", "tie": "It's a tie! 🤝", "lose": "I win! 🤖"}
+
+TRIVIA_QUESTIONS = (
+    {"q": "What is the capital of France?", "a": "Paris"},
+    {"q": "What is 2 + 2?", "a": "4"},
+    {"q": "What is the largest planet in our solar system?", "a": "Jupiter"},
+    {"q": "Who painted the Mona Lisa?", "a": "Leonardo da Vinci"},
+    {"q": "What is the smallest prime number?", "a": "2"},
+    {"q": "In what year did World War II end?", "a": "1945"},
+    {"q": "What is the chemical symbol for gold?", "a": "Au"},
+    {"q": "How many continents are there?", "a": "7"},
+)
+
+
+def split_message(text: str, limit: int = TELEGRAM_MESSAGE_LIMIT) -> list:
+    """Split text into chunks that fit in a Telegram message, breaking on lines where possible."""
+    chunks = []
+    current = ""
+    for line in text.splitlines(keepends=True):
+        while len(line) > limit:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:limit])
+            line = line[limit:]
+        if len(current) + len(line) > limit:
+            chunks.append(current)
+            current = line
+        else:
+            current += line
+    if current:
+        chunks.append(current)
+    # Trim only the line breaks at each split point so indentation survives
+    return [chunk.strip("\n") for chunk in chunks if chunk.strip()]
+
+
+class StreamingReply:
+    """Placeholder message that is edited in place as an answer streams in.
+
+    Progress edits are best-effort and rendered by a background task, so a
+    slow or failing Telegram edit never holds up or aborts the Gemini stream.
+    Answers longer than a single Telegram message continue in follow-up messages.
+    """
+
+    def __init__(self, message):
+        self.messages = [message]
+        self.shown = [message.text]
+        if message.chat.type == ChatType.PRIVATE:
+            self.edit_interval = STREAM_EDIT_INTERVAL
+        else:
+            self.edit_interval = STREAM_EDIT_INTERVAL_GROUP
+        self._pending = None
+        self._next_edit = 0.0
+        self._editing = False
+        self._renderer = None
+
+    def update(self, text: str):
+        """Queue partial text to be shown, at most once per edit_interval."""
+        self._pending = text
+        if self._renderer is None or self._renderer.done():
+            self._renderer = asyncio.create_task(self._render())
+
+    async def show(self, text: str):
+        """Show the final text, superseding any queued progress edit.
+
+        Waits out the edit interval or a rate-limit pause first, and retries once on RetryAfter.
+        """
+        self._pending = None
+        renderer = self._renderer
+        if renderer is not None and not renderer.done():
+            if not self._editing:
+                renderer.cancel()
+            await asyncio.wait([renderer])
+
+        chunks = split_message(text) or [EMPTY_ANSWER_TEXT]
+        delay = self._next_edit - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        try:
+            await self._apply(chunks)
+        except RetryAfter as e:
+            logger.warning("Final edit rate limited, retrying in %ss", e.retry_after)
+            await asyncio.sleep(e.retry_after)
+            await self._apply(chunks)
+
+    async def _render(self):
+        while self._pending is not None:
+            delay = self._next_edit - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            text, self._pending = self._pending, None
+            if text is None:
+                break
+            chunks = split_message(text)
+            if not chunks:
+                continue
+
+            self._editing = True
+            try:
+                await self._apply(chunks)
+            except RetryAfter as e:
+                logger.warning("Progress edit rate limited, pausing for %ss", e.retry_after)
+                self._next_edit = time.monotonic() + e.retry_after
+            except TelegramError as e:
+                logger.warning("Skipping progress edit: %s", e)
+            finally:
+                self._editing = False
+
+    async def _apply(self, chunks: list):
+        for i, chunk in enumerate(chunks):
+            if i == len(self.messages):
+                self.messages.append(await self.messages[0].chat.send_message(chunk))
+                self.shown.append(chunk)
+            elif chunk != self.shown[i]:
+                await self.messages[i].edit_text(chunk)
+                self.shown[i] = chunk
+            else:
+                continue
+            self._next_edit = time.monotonic() + self.edit_interval
+
+        # Remove follow-ups left over from a longer earlier text (e.g. a retried stream or an error)
+        while len(self.messages) > max(len(chunks), 1):
+            await self.messages[-1].delete()
+            self.messages.pop()
+            self.shown.pop()
+
+
+async def _generate(text: str, on_progress):
+    """Stream an answer, returning it with the time to its first chunk.
+
+    Total generation time grows with answer length, so only the
+    time-to-first-chunk is reported to the limiter as Gemini latency.
+    """
+    started = time.monotonic()
+    first_chunk_latency = None
+    response = await model.generate_content_async(text, stream=True)
+    answer = ""
+    async for chunk in response:
+        if first_chunk_latency is None:
+            first_chunk_latency = time.monotonic() - started
+        answer += chunk.text
+        on_progress(answer)
+    if first_chunk_latency is None:
+        first_chunk_latency = time.monotonic() - started
+    return answer, first_chunk_latency
+
+
+async def call_gemini(text: str, on_progress, attempts: int = 3) -> str:
+    """Send a prompt to Gemini, respecting the rate and concurrency limits.
+
+    The answer is streamed and on_progress is called with the accumulated
+    text after every chunk.
+
+    Rate-limit and availability errors are retried with exponential backoff
+    and jitter; anything else is raised immediately.
+    """
+    for attempt in range(attempts):
+        try:
+            async with gemini_rate_limiter:
+                return await gemini_limiter.call(_generate, text, on_progress)
+        except GEMINI_RETRYABLE_ERRORS as e:
+            if attempt == attempts - 1:
+                raise
+            delay = min(GEMINI_RETRY_MAX_DELAY, GEMINI_RETRY_BASE_DELAY * 2 ** attempt) + RNG.random() * 0.1
+            logger.warning("Gemini transient error (%s), retrying in %.2fs", type(e).__name__, delay)
+            await asyncio.sleep(delay)
+
+
+async def cached_answer(question: str, fetch) -> str:
+    """Answer a question, reusing recent answers to the same question.
+
+    On a cache miss the answer is produced by awaiting fetch(question).
+    Concurrent requests for the same question share a single upstream call.
+    """
+    key = hashlib.blake2b(question.strip().lower().encode(), digest_size=16).digest()
+    if key in answer_cache:
+        return answer_cache[key]
+
+    entry = answer_locks.get(key)
+    if entry is None:
+        entry = answer_locks[key] = [asyncio.Lock(), 0]
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            if key in answer_cache:
+                return answer_cache[key]
+            answer = await fetch(question)
+            answer_cache[key] = answer
+            return answer
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0:
+            del answer_locks[key]
 
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Send a message when the command /start is issued."""
-    await update.message.reply_text(
-        "🤖 Hello! I'm a Gemini-powered bot!\n\n"
-        "Commands:\n"
-        "/help - Show all commands\n"
-        "/ask [question] - Ask me anything\n"
-        "/dice - Roll a dice\n"
-        "/8ball [question] - Magic 8-ball\n"
-        "/trivia - Random trivia question\n"
-        "/rps [rock/paper/scissors] - Play Rock Paper Scissors\n"
-        "/flip - Flip a coin\n\n"
-        "In groups, mention me or reply to my messages to chat!"
-    )
+    await context.bot.send_message(update.effective_chat.id, START_TEXT, link_preview_options=NO_LINK_PREVIEW)
 
 
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Send help message."""
-    await update.message.reply_text(
-        "📚 Available Commands:\n\n"
-        "🤖 AI Commands:\n"
-        "/ask [question] - Ask Gemini anything\n\n"
-        "🎮 Mini-Games:\n"
-        "/dice - Roll a 6-sided dice\n"
-        "/flip - Flip a coin\n"
-        "/8ball [question] - Ask the magic 8-ball\n"
-        "/trivia - Get a random trivia question\n"
-        "/rps [choice] - Rock, Paper, Scissors\n"
-        "  Example: /rps rock\n\n"
-        "💬 Group Chat:\n"
-        "Mention @botname or reply to my messages to chat with Gemini!"
-    )
+    await context.bot.send_message(update.effective_chat.id, HELP_TEXT, link_preview_options=NO_LINK_PREVIEW)
 
 
 async def ask_gemini(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -72,23 +459,30 @@ async def ask_gemini(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     question = ' '.join(context.args)
-    await update.message.reply_text("🤔 Thinking...")
+    reply = StreamingReply(await update.message.reply_text("🤔 Thinking..."))
 
     try:
-        response = model.generate_content(question)
-        await update.message.reply_text(response.text)
-    except Exception as e:
-        logger.error(f"Gemini API error: {e}")
-        await update.message.reply_text(f"❌ Error: {str(e)}")
+        answer = await cached_answer(question, lambda q: call_gemini(q, on_progress=reply.update))
+    except Exception:
+        logger.exception("Gemini API error")
+        answer = "❌ Sorry, I couldn't get an answer right now. Please try again later."
+
+    try:
+        await reply.show(answer)
+    except TelegramError:
+        logger.exception("Failed to deliver answer")
 
 
 async def handle_group_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle messages in group chats where bot is mentioned or replied to."""
     message = update.message
-    bot_username = context.bot.username
+    mention = context.bot_data.get("mention")
+    if mention is None:
+        mention = context.bot_data["mention"] = f"@{context.bot.username}"
 
     # Check if bot is mentioned or message is a reply to bot
-    is_mentioned = f"@{bot_username}" in message.text if message.text else False
+    mention_idx = message.text.find(mention) if message.text else -1
+    is_mentioned = mention_idx >= 0
     is_reply_to_bot = (
             message.reply_to_message
             and message.reply_to_message.from_user.id == context.bot.id
@@ -98,58 +492,62 @@ async def handle_group_message(update: Update, context: ContextTypes.DEFAULT_TYP
         return
 
     # Extract the actual message (remove mention)
-    text = message.text.replace(f"@{bot_username}", "").strip()
+    text = message.text
+    if is_mentioned:
+        text = text[:mention_idx] + text[mention_idx + len(mention):]
+    text = text.strip()
 
     if not text:
         await message.reply_text("Yes? How can I help you?")
         return
 
-    try:
-        response = model.generate_content(text)
-        await message.reply_text(response.text)
-    except Exception as e:
-        logger.error(f"Gemini API error: {e}")
-        await message.reply_text(f"❌ Sorry, I encountered an error: {str(e)}")
+    lock = chat_locks.get(message.chat_id)
+    if lock is None:
+        lock = chat_locks[message.chat_id] = asyncio.Lock()
+
+    async with lock:
+        reply = StreamingReply(await message.reply_text("🤔 Thinking..."))
+
+        try:
+            answer = await call_gemini(text, on_progress=reply.update)
+        except Exception:
+            logger.exception("Gemini API error")
+            answer = "❌ Sorry, I encountered an error. Please try again later."
+
+        try:
+            await reply.show(answer)
+        except TelegramError:
+            logger.exception("Failed to deliver answer")
 
 
 async def roll_dice(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Roll a dice mini-game."""
-    result = random.randint(1, 6)
-    dice_emoji = ["⚀", "⚁", "⚂", "⚃", "⚄", "⚅"][result - 1]
-    await update.message.reply_text(f"🎲 You rolled: {dice_emoji} ({result})")
+    idx = RNG.randrange(6)
+    await context.bot.send_message(update.effective_chat.id, f"🎲 You rolled: {DICE_FACES[idx]} ({idx + 1})")
 
 
 async def flip_coin(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Flip a coin mini-game."""
-    result = random.choice(["Heads", "Tails"])
+    result = RNG.choice(COIN_SIDES)
     emoji = "🪙" if result == "Heads" else "🔘"
-    await update.message.reply_text(f"{emoji} The coin landed on: **{result}**!")
+    await context.bot.send_message(update.effective_chat.id, f"{emoji} The coin landed on: **{result}**!")
 
 
 async def magic_8ball(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Magic 8-ball mini-game."""
-    responses = [
-        "Yes, definitely!", "It is certain.", "Without a doubt.",
-        "You may rely on it.", "As I see it, yes.", "Most likely.",
-        "Outlook good.", "Signs point to yes.", "Reply hazy, try again.",
-        "Ask again later.", "Better not tell you now.", "Cannot predict now.",
-        "Concentrate and ask again.", "Don't count on it.", "My reply is no.",
-        "My sources say no.", "Outlook not so good.", "Very doubtful."
-    ]
-
     if not context.args:
-        await update.message.reply_text("🔮 Ask the magic 8-ball a yes/no question!\nExample: /8ball Will I win?")
+        await context.bot.send_message(
+            update.effective_chat.id, "🔮 Ask the magic 8-ball a yes/no question!\nExample: /8ball Will I win?"
+        )
         return
 
-    result = random.choice(responses)
-    await update.message.reply_text(f"🔮 The magic 8-ball says: **{result}**")
+    result = RNG.choice(EIGHT_BALL_RESPONSES)
+    await context.bot.send_message(update.effective_chat.id, f"🔮 The magic 8-ball says: **{result}**")
 
 
 async def rock_paper_scissors(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Rock Paper Scissors mini-game."""
-    choices = ["rock", "paper", "scissors"]
-
-    if not context.args or context.args[0].lower() not in choices:
+    if not context.args or context.args[0].lower() not in RPS_CHOICES:
         await update.message.reply_text(
             "✊✋✌️ Choose rock, paper, or scissors!\n"
             "Example: /rps rock"
@@ -157,62 +555,57 @@ async def rock_paper_scissors(update: Update, context: ContextTypes.DEFAULT_TYPE
         return
 
     user_choice = context.args[0].lower()
-    bot_choice = random.choice(choices)
-
-    emoji_map = {"rock": "✊", "paper": "✋", "scissors": "✌️"}
-
-    # Determine winner
-    if user_choice == bot_choice:
-        result = "It's a tie! 🤝"
-    elif (
-            (user_choice == "rock" and bot_choice == "scissors") or
-            (user_choice == "paper" and bot_choice == "rock") or
-            (user_choice == "scissors" and bot_choice == "paper")
-    ):
-        result = "You win! 🎉"
-    else:
-        result = "I win! 🤖"
+    bot_choice = RNG.choice(RPS_CHOICES)
+
+    result = RPS_RESULT_TEXT[RPS_OUTCOME.get((user_choice, bot_choice), "lose")]
 
     await update.message.reply_text(
-        f"You chose: {emoji_map[user_choice]} {user_choice}\n"
-        f"I chose: {emoji_map[bot_choice]} {bot_choice}\n\n"
+        f"You chose: {RPS_EMOJI[user_choice]} {user_choice}\n"
+        f"I chose: {RPS_EMOJI[bot_choice]} {bot_choice}\n\n"
         f"{result}"
     )
 
 
+async def next_trivia_index(chat_id: int) -> int:
+    """Deal the next question from the chat's shuffled deck, reshuffling when it runs out."""
+    # Keyed by pool size so a deck dealt before the question list changed is never reused
+    deck_key = f"trivia_deck:{chat_id}:{len(TRIVIA_QUESTIONS)}"
+    idx = await redis_client.lpop(deck_key)
+    if idx is None:
+        # Deck is empty: shuffle a new one; the script still pops first in case another call refilled it
+        deck = RNG.sample(range(len(TRIVIA_QUESTIONS)), len(TRIVIA_QUESTIONS))
+        idx = await deal_trivia_script(keys=[deck_key], args=[TRIVIA_DECK_TTL, *deck])
+    return int(idx)
+
+
 async def trivia(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Trivia mini-game."""
-    questions = [
-        {"q": "What is the capital of France?", "a": "Paris"},
-        {"q": "What is 2 + 2?", "a": "4"},
-        {"q": "What is the largest planet in our solar system?", "a": "Jupiter"},
-        {"q": "Who painted the Mona Lisa?", "a": "Leonardo da Vinci"},
-        {"q": "What is the smallest prime number?", "a": "2"},
-        {"q": "In what year did World War II end?", "a": "1945"},
-        {"q": "What is the chemical symbol for gold?", "a": "Au"},
-        {"q": "How many continents are there?", "a": "7"},
-    ]
-
     chat_id = update.effective_chat.id
+    trivia_key = f"trivia:{chat_id}"
 
-    # Check if answering previous question
-    if chat_id in game_state and 'trivia_answer' in game_state[chat_id]:
-        if context.args:
-            user_answer = ' '.join(context.args).strip()
-            correct_answer = game_state[chat_id]['trivia_answer']
+    try:
+        # Check if answering previous question
+        correct_answer = await redis_client.getdel(trivia_key) if context.args else None
+
+        if correct_answer is None:
+            # New question
+            question_data = TRIVIA_QUESTIONS[await next_trivia_index(chat_id)]
+            await redis_client.set(trivia_key, question_data['a'], ex=TRIVIA_TTL)
+    except RedisError:
+        logger.exception("Trivia storage error")
+        await update.message.reply_text("❌ Trivia is unavailable right now. Please try again later.")
+        return
 
-            if user_answer.lower() == correct_answer.lower():
-                await update.message.reply_text("✅ Correct! Well done! 🎉")
-            else:
-                await update.message.reply_text(f"❌ Wrong! The correct answer was: {correct_answer}")
+    if correct_answer is not None:
+        user_answer = ' '.join(context.args).strip()
 
-            del game_state[chat_id]['trivia_answer']
-            await update.message.reply_text("Type /trivia for another question!")
-            return
+        if user_answer.lower() == correct_answer.lower():
+            await update.message.reply_text("✅ Correct! Well done! 🎉")
+        else:
+            await update.message.reply_text(f"❌ Wrong! The correct answer was: {correct_answer}")
 
-    # New question
-    question_data = random.choice(questions)
-    game_state[chat_id] = {'trivia_answer': question_data['a']}
+        await update.message.reply_text("Type /trivia for another question!")
+        return
 
     await update.message.reply_text(
         f"❓ Trivia Question:\n\n{question_data['q']}\n\n"
@@ -220,9 +613,17 @@ async def trivia(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
 
 
+async def post_init(application: Application):
+    """Warm up the Gemini channel so the first user request skips the TLS handshake."""
+    try:
+        await model.count_tokens_async("ping")
+    except Exception as e:
+        logger.warning("Gemini warm-up failed: %s", e)
+
+
 async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Log errors."""
-    logger.error(f"Update {update} caused error {context.error}")
+    logger.error("Update %s caused error %s", update, context.error, exc_info=context.error)
 
 
 def main():
@@ -235,8 +636,23 @@ def main():
         logger.error("GEMINI_API_KEY not found in environment variables!")
         return
 
-    # Create application
-    application = Application.builder().token(TELEGRAM_TOKEN).build()
+    # Create application (keep-alive connection pool shared by all handlers)
+    application = (
+        Application.builder()
+        .token(TELEGRAM_TOKEN)
+        .request(OrjsonRequest(
+            connection_pool_size=64,
+            pool_timeout=30,
+            connect_timeout=10,
+            read_timeout=30,
+            write_timeout=30,
+            http_version="1.1",
+        ))
+        .get_updates_request(OrjsonRequest())
+        .concurrent_updates(True)
+        .post_init(post_init)
+        .build()
+    )
 
     # Command handlers
     application.add_handler(CommandHandler("start", start))
@@ -251,7 +667,8 @@ def main():
     # Message handler for group chats
     application.add_handler(
         MessageHandler(
-            filters.TEXT & ~filters.COMMAND & filters.ChatType.GROUPS,
+            filters.TEXT & ~filters.COMMAND & filters.ChatType.GROUPS
+            & (filters.Entity("mention") | filters.REPLY),
             handle_group_message
         )
     )
@@ -260,8 +677,22 @@ def main():
     application.add_error_handler(error_handler)
 
     # Start the bot
-    logger.info("Bot starting...")
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    if uvloop is not None:
+        uvloop.install()
+
+    if WEBHOOK_URL:
+        logger.info("Bot starting (webhook)...")
+        application.run_webhook(
+            listen="0.0.0.0",
+            port=PORT,
+            url_path=TELEGRAM_TOKEN,
+            webhook_url=f"{WEBHOOK_URL.rstrip('/')}/{TELEGRAM_TOKEN}",
+            secret_token=WEBHOOK_SECRET,
+            allowed_updates=ALLOWED_UPDATES,
+        )
+    else:
+        logger.info("Bot starting (polling)...")
+        application.run_polling(allowed_updates=ALLOWED_UPDATES)
 
 
 if __name__ == '__main__':